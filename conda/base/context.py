@@ -27,7 +27,7 @@ from .._vendor.toolz import concat, concatv, unique
 from ..common.compat import NoneType, iteritems, itervalues, odict, on_win, string_types
 from ..common.configuration import (Configuration, ConfigurationLoadError, MapParameter,
                                     PrimitiveParameter, SequenceParameter, ValidationError)
-from ..common._os.linux import linux_get_libc_version
+from ..common._os.linux import linux_get_libc_version, linux_get_os_release
 from ..common.path import expand, paths_equal
 from ..common.url import has_scheme, path_to_url, split_scheme_auth_token
 from ..common.decorators import env_override
@@ -189,6 +189,9 @@ class Context(Configuration):
     remote_connect_timeout_secs = PrimitiveParameter(9.15)
     remote_read_timeout_secs = PrimitiveParameter(60.)
     remote_max_retries = PrimitiveParameter(3)
+    http_pool_maxsize = PrimitiveParameter(32)
+    s3_max_concurrency = PrimitiveParameter(10)
+    s3_multipart_chunksize = PrimitiveParameter(8 * 1024 * 1024)
 
     add_anaconda_token = PrimitiveParameter(True, aliases=('add_binstar_token',))
 
@@ -696,12 +699,19 @@ class Context(Configuration):
         #   'Windows', '10.0.17134'
         platform_name = self.platform_system_release[0]
         if platform_name == 'Linux':
-            from .._vendor.distro import id, version
-            try:
-                distinfo = id(), version(best=True)
-            except Exception as e:
-                log.debug('%r', e, exc_info=True)
-                distinfo = ('Linux', 'unknown')
+            # Reading /etc/os-release is a single small file read. Importing the vendored
+            # distro module runs `lsb_release -a` in a subprocess, so only fall back to it
+            # on systems without os-release.
+            os_release = linux_get_os_release()
+            if os_release.get('ID'):
+                distinfo = os_release['ID'], os_release.get('VERSION_ID', 'unknown')
+            else:
+                from .._vendor.distro import id, version
+                try:
+                    distinfo = id(), version(best=True)
+                except Exception as e:
+                    log.debug('%r', e, exc_info=True)
+                    distinfo = ('Linux', 'unknown')
             distribution_name, distribution_version = distinfo[0], distinfo[1]
         elif platform_name == 'Darwin':
             distribution_name = 'OSX'
@@ -756,12 +766,15 @@ class Context(Configuration):
         ('Network Configuration', (
             'client_ssl_cert',
             'client_ssl_cert_key',
+            'http_pool_maxsize',
             'local_repodata_ttl',
             'offline',
             'proxy_servers',
             'remote_connect_timeout_secs',
             'remote_max_retries',
             'remote_read_timeout_secs',
+            's3_max_concurrency',
+            's3_multipart_chunksize',
             'ssl_verify',
         )),
         ('Solver Configuration', (
@@ -1012,6 +1025,10 @@ class Context(Configuration):
             #     to build 32-bit packages on a 64-bit system).  We don't want to mention it
             #     in the documentation, because it can mess up a lot of things.
             #     """),
+            'http_pool_maxsize': dals("""
+                The maximum number of connections kept open in the pool for each remote host.
+                Raise this if many packages are downloaded in parallel from a single channel.
+                """),
             'json': dals("""
                 Ensure all output written to stdout is structured json.
                 """),
@@ -1101,6 +1118,16 @@ class Context(Configuration):
                 Should any error occur during an unlink/link transaction, revert any disk
                 mutations made to that point in the transaction.
                 """),
+            's3_max_concurrency': dals("""
+                The maximum number of threads used to download a single package from an
+                s3:// channel. Packages larger than s3_multipart_chunksize are fetched as
+                concurrent byte-range requests.
+                """),
+            's3_multipart_chunksize': dals("""
+                The size in bytes of each byte-range request used when downloading a package
+                from an s3:// channel. Packages smaller than this are fetched with a single
+                request.
+                """),
             'safety_checks': dals("""
                 Enforce available safety guarantees during package installation.
                 The value must be one of 'enabled', 'warn', or 'disabled'.
@@ -73,3 +73,21 @@ def linux_get_libc_version():
         log.warning("Failed to detect non-glibc family, assuming %s (%s)", family, version)
         return family, version
     return family, version
+
+
+def linux_get_os_release(path='/etc/os-release'):
+    """
+    Parse an os-release(5) file into a dict of its KEY=value pairs. Returns an empty dict if
+    the file cannot be read.
+    """
+    try:
+        with open(path) as fh:
+            content = fh.read()
+    except (IOError, OSError):
+        return {}
+    os_release = {}
+    for line in content.splitlines():
+        key, sep, value = line.strip().partition('=')
+        if sep and key and not key.startswith('#'):
+            os_release[key] = value.strip('"\'')
+    return os_release
@@ -130,6 +130,7 @@ def urlparse(url):
     return parse_url(url)
 
 
+@memoize
 def url_to_s3_info(url):
     """Convert an s3 url to a tuple of bucket and key.
 
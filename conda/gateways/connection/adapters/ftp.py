@@ -20,17 +20,21 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from base64 import b64decode
-import cgi
 import ftplib
 from io import BytesIO
 from logging import getLogger
 import os
 
 from .. import BaseAdapter, Response, dispatch_hook
-from ....common.compat import StringIO
+from ....common.compat import StringIO, ensure_binary
 from ....common.url import urlparse
 from ....exceptions import AuthenticationError
 
+try:
+    from email import message_from_bytes
+except ImportError:  # pragma: py3 no cover
+    from email import message_from_string as message_from_bytes
+
 log = getLogger(__name__)
 
 
@@ -265,25 +269,15 @@ def build_response(request, data, code, encoding):
 def parse_multipart_files(request):
     """Given a prepared reqest, return a file-like object containing the
     original data. This is pretty hacky."""
-    # Start by grabbing the pdict.
-    _, pdict = cgi.parse_header(request.headers['Content-Type'])
-
-    # Now, wrap the multipart data in a BytesIO buffer. This is annoying.
-    buf = BytesIO()
-    buf.write(request.body)
-    buf.seek(0)
-
-    # Parse the data. Simply take the first file.
-    data = cgi.parse_multipart(buf, pdict)
-    _, filedata = data.popitem()
-    buf.close()
-
-    # Get a BytesIO now, and write the file into it.
-    buf = BytesIO()
-    buf.write(''.join(filedata))
-    buf.seek(0)
-
-    return buf
+    # Prepend the Content-Type header so the body parses as a single MIME message.
+    header = ensure_binary('Content-Type: %s\r\n\r\n' % request.headers['Content-Type'])
+    message = message_from_bytes(header + request.body)
+
+    # Simply take the first file.
+    for part in message.walk():
+        if part.get('Content-Disposition', '').startswith('form-data'):
+            return BytesIO(part.get_payload(decode=True))
+    return BytesIO()
 
 
 def get_status_code_from_code_response(code):
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2012 Anaconda, Inc
+# SPDX-License-Identifier: BSD-3-Clause
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from socket import IPPROTO_TCP, SOL_SOCKET, SO_KEEPALIVE, TCP_NODELAY
+
+from .. import HTTPAdapter
+
+SOCKET_OPTIONS = [
+    (IPPROTO_TCP, TCP_NODELAY, 1),
+    (SOL_SOCKET, SO_KEEPALIVE, 1),
+]
+
+
+class CondaHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter whose pooled connections disable Nagle and enable TCP keep-alive."""
+
+    def init_poolmanager(self, *args, **pool_kwargs):
+        pool_kwargs.setdefault('socket_options', SOCKET_OPTIONS)
+        return super(CondaHTTPAdapter, self).init_poolmanager(*args, **pool_kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        proxy_kwargs.setdefault('socket_options', SOCKET_OPTIONS)
+        return super(CondaHTTPAdapter, self).proxy_manager_for(proxy, **proxy_kwargs)
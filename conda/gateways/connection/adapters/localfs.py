@@ -7,15 +7,88 @@ from email.utils import formatdate
 import json
 from logging import getLogger
 from mimetypes import guess_type
+from mmap import ACCESS_READ, mmap
 from os import stat
+from os.path import splitext
 from tempfile import SpooledTemporaryFile
 
 from .. import BaseAdapter, CaseInsensitiveDict, Response
+from ...._vendor.auxlib.decorators import memoize
 from ....common.compat import ensure_binary
 from ....common.path import url_to_path
 
 log = getLogger(__name__)
 
+# content types for the files conda actually serves from local channels; anything else
+# falls through to mimetypes, which reads the system mime.types database on first use
+_EXT_TO_MIME = {
+    '.bz2': 'application/x-bzip2',
+    '.conda': 'application/octet-stream',
+    '.json': 'application/json',
+    '.tar': 'application/x-tar',
+    '.yaml': 'text/yaml',
+    '.yml': 'text/yaml',
+}
+
+
+@memoize
+def format_http_date(timestamp):
+    # RFC 2822 dates have whole-second resolution, so files laid down together share an entry
+    return formatdate(timestamp, usegmt=True)
+
+
+def guess_content_type(pathname):
+    try:
+        return _EXT_TO_MIME[splitext(pathname)[1].lower()]
+    except KeyError:
+        return guess_type(pathname)[0] or "text/plain"
+
+
+class MmapFile(object):
+    """
+    A read-only file-like object backed by a memory map of the whole file, so reads are
+    served straight from the page cache without an intermediate buffered-I/O copy.
+    """
+
+    def __init__(self, pathname):
+        # Keep the descriptor as a file object so that it is closed on garbage collection even
+        # if the response is never closed; it stays open so fileno() consumers can sendfile.
+        self._fh = open(pathname, 'rb')
+        try:
+            self._mm = mmap(self._fh.fileno(), 0, access=ACCESS_READ)
+        except Exception:
+            self._fh.close()
+            raise
+        self.closed = False
+
+    def fileno(self):
+        return self._fh.fileno()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self._mm) - self._mm.tell()
+        return self._mm.read(size)
+
+    def readinto(self, buf):
+        start = self._mm.tell()
+        end = min(start + len(buf), len(self._mm))
+        buf[:end - start] = self._mm[start:end]
+        self._mm.seek(end)
+        return end - start
+
+    def seek(self, offset, whence=0):
+        self._mm.seek(offset, whence)
+        return self._mm.tell()
+
+    def tell(self):
+        return self._mm.tell()
+
+    def close(self):
+        if not self.closed:
+            self._mm.close()
+            self._fh.close()
+            self.closed = True
+
 
 class LocalFSAdapter(BaseAdapter):
 
@@ -41,15 +114,16 @@ class LocalFSAdapter(BaseAdapter):
             resp.raw = fh
             resp.close = resp.raw.close
         else:
-            modified = formatdate(stats.st_mtime, usegmt=True)
-            content_type = guess_type(pathname)[0] or "text/plain"
+            modified = format_http_date(int(stats.st_mtime))
+            content_type = guess_content_type(pathname)
             resp.headers = CaseInsensitiveDict({
                 "Content-Type": content_type,
                 "Content-Length": stats.st_size,
                 "Last-Modified": modified,
             })
 
-            resp.raw = open(pathname, "rb")
+            # mmap rejects zero-length files
+            resp.raw = MmapFile(pathname) if stats.st_size else open(pathname, "rb")
             resp.close = resp.raw.close
         return resp
 
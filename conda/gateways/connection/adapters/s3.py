@@ -5,15 +5,122 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import json
 from logging import LoggerAdapter, getLogger
-from tempfile import SpooledTemporaryFile
+from tempfile import SpooledTemporaryFile, TemporaryFile
+from threading import Lock
 
 from .. import BaseAdapter, CaseInsensitiveDict, Response
+from ...._vendor.auxlib.decorators import memoize
+from ....base.context import context
 from ....common.compat import ensure_binary
 from ....common.url import url_to_s3_info
 
 log = getLogger(__name__)
 stderrlog = LoggerAdapter(getLogger('conda.stderrlog'), extra=dict(terminator="\n"))
 
+# packages larger than this spill from memory to disk while downloading
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+_s3_transfer = None
+_s3_transfer_lock = Lock()
+
+# anonymous temp files kept around for reuse by downloads larger than SPOOL_MAX_SIZE
+_spill_files = []
+_spill_files_lock = Lock()
+
+
+@memoize
+def _import_boto():
+    """
+    Return a (boto3, boto) pair, with None in place of whichever is not installed. Python does
+    not cache failed imports, so remember the outcome rather than searching sys.path again on
+    every request.
+    """
+    try:
+        import boto3
+        return boto3, None
+    except ImportError:
+        pass
+    try:
+        import boto
+        return None, boto
+    except ImportError:
+        return None, None
+
+
+def _get_s3_transfer(boto3):
+    """Return a process-wide (client, TransferConfig) pair.
+
+    boto3 clients are thread-safe, so a single client (and its connection pool) is shared by
+    every S3Adapter. The TransferConfig makes objects larger than s3_multipart_chunksize
+    download as up to s3_max_concurrency parallel byte-range GETs.
+    """
+    global _s3_transfer
+    if _s3_transfer is None:
+        with _s3_transfer_lock:
+            if _s3_transfer is None:
+                from boto3.s3.transfer import TransferConfig
+                transfer_config = TransferConfig(
+                    multipart_threshold=context.s3_multipart_chunksize,
+                    multipart_chunksize=context.s3_multipart_chunksize,
+                    max_concurrency=context.s3_max_concurrency,
+                )
+                _s3_transfer = boto3.client('s3'), transfer_config
+    return _s3_transfer
+
+
+def _acquire_spill_file():
+    with _spill_files_lock:
+        if _spill_files:
+            return _spill_files.pop()
+    return TemporaryFile()
+
+
+def _release_spill_file(fh):
+    """
+    Truncate a spill file and keep it for the next large download, so each package does not
+    pay for creating and unlinking a fresh file. At most s3_max_concurrency files are kept.
+    """
+    if fh.closed:
+        return
+    fh.seek(0)
+    fh.truncate()
+    with _spill_files_lock:
+        if len(_spill_files) < context.s3_max_concurrency:
+            _spill_files.append(fh)
+            return
+    fh.close()
+
+
+def _release_once(fh):
+    # response.close() may be called more than once; only the first call may hand the file
+    # back, or a file that is already in use by another download would be truncated
+    released = []
+
+    def close():
+        if not released:
+            released.append(True)
+            _release_spill_file(fh)
+    return close
+
+
+class StreamingBodyReader(object):
+    """Adds the tell() that download() relies on to a botocore StreamingBody."""
+
+    def __init__(self, body):
+        self._body = body
+        self._position = 0
+
+    def read(self, amt=None):
+        data = self._body.read(amt)
+        self._position += len(data)
+        return data
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        self._body.close()
+
 
 class S3Adapter(BaseAdapter):
 
@@ -25,20 +132,18 @@ class S3Adapter(BaseAdapter):
         resp.status_code = 200
         resp.url = request.url
 
-        try:
-            import boto3
+        boto3, boto = _import_boto()
+        if boto3:
             return self._send_boto3(boto3, resp, request)
-        except ImportError:
-            try:
-                import boto
-                return self._send_boto(boto, resp, request)
-            except ImportError:
-                stderrlog.info('\nError: boto3 is required for S3 channels. '
-                               'Please install with `conda install boto3`\n'
-                               'Make sure to run `source deactivate` if you '
-                               'are in a conda environment.\n')
-                resp.status_code = 404
-                return resp
+        elif boto:
+            return self._send_boto(boto, resp, request)
+        else:
+            stderrlog.info('\nError: boto3 is required for S3 channels. '
+                           'Please install with `conda install boto3`\n'
+                           'Make sure to run `source deactivate` if you '
+                           'are in a conda environment.\n')
+            resp.status_code = 404
+            return resp
 
     def close(self):
         pass
@@ -46,11 +151,11 @@ class S3Adapter(BaseAdapter):
     def _send_boto3(self, boto3, resp, request):
         from botocore.exceptions import BotoCoreError, ClientError
         bucket_name, key_string = url_to_s3_info(request.url)
-
-        key = boto3.resource('s3').Object(bucket_name, key_string[1:])
+        key_string = key_string[1:]
+        client, transfer_config = _get_s3_transfer(boto3)
 
         try:
-            response = key.get()
+            response = client.head_object(Bucket=bucket_name, Key=key_string)
         except (BotoCoreError, ClientError) as e:
             resp.status_code = 404
             message = {
@@ -69,8 +174,27 @@ class S3Adapter(BaseAdapter):
             "Last-Modified": key_headers['last-modified'],
         })
 
-        resp.raw = self._write_tempfile(key.download_fileobj)
-        resp.close = resp.raw.close
+        def download_fileobj(fh):
+            client.download_fileobj(bucket_name, key_string, fh, Config=transfer_config)
+
+        if response['ContentLength'] < transfer_config.multipart_threshold:
+            # a single GET anyway; stream its body to the caller without buffering
+            body = client.get_object(Bucket=bucket_name, Key=key_string)['Body']
+            resp.raw = StreamingBodyReader(body)
+            resp.close = resp.raw.close
+        elif response['ContentLength'] <= SPOOL_MAX_SIZE:
+            resp.raw = self._write_tempfile(download_fileobj)
+            resp.close = resp.raw.close
+        else:
+            fh = _acquire_spill_file()
+            try:
+                download_fileobj(fh)
+            except Exception:
+                _release_spill_file(fh)
+                raise
+            fh.seek(0)
+            resp.raw = fh
+            resp.close = _release_once(fh)
 
         return resp
 
@@ -103,7 +227,7 @@ class S3Adapter(BaseAdapter):
         return resp
 
     def _write_tempfile(self, writer_callable):
-        fh = SpooledTemporaryFile()
+        fh = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
         writer_callable(fh)
         fh.seek(0)
         return fh
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: BSD-3-Clause
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from functools import partial
 import hashlib
 from logging import DEBUG, getLogger
 from os.path import basename, exists, join
@@ -19,16 +20,37 @@ from ..._vendor.auxlib.logz import stringify
 from ...base.context import context
 from ...common.compat import text_type
 from ...common.io import time_recorder
+from ...common.url import urlparse
 from ...exceptions import (BasicClobberError, CondaDependencyError, CondaHTTPError,
                            ChecksumMismatchError, maybe_raise, ProxyError)
 
 log = getLogger(__name__)
 
+# packages at least this large are fetched as parallel byte-range requests
+RANGED_DOWNLOAD_MIN_SIZE = 32 * 1024 * 1024
+
 
 def disable_ssl_verify_warning():
     warnings.simplefilter('ignore', InsecureRequestWarning)
 
 
+def probe_ranged_download(session, url, timeout):
+    """
+    Return the Content-Length advertised by a HEAD request for url if the server will serve it
+    as byte ranges and it is large enough to be worth splitting, otherwise None.
+    """
+    resp = session.head(url, proxies=session.proxies, timeout=timeout, allow_redirects=True)
+    resp.close()
+    content_length = int(resp.headers.get('Content-Length', 0))
+    # Content-Encoding would make the byte ranges refer to the encoded stream
+    if (resp.status_code == 200
+            and resp.headers.get('Accept-Ranges') == 'bytes'
+            and 'Content-Encoding' not in resp.headers
+            and content_length >= RANGED_DOWNLOAD_MIN_SIZE):
+        return content_length
+    return None
+
+
 @time_recorder("download")
 def download(
         url, target_full_path, md5=None, sha256=None, size=None, progress_update_callback=None
@@ -42,12 +64,6 @@ def download(
     try:
         timeout = context.remote_connect_timeout_secs, context.remote_read_timeout_secs
         session = CondaSession()
-        resp = session.get(url, stream=True, proxies=session.proxies, timeout=timeout)
-        if log.isEnabledFor(DEBUG):
-            log.debug(stringify(resp, content_max_len=256))
-        resp.raise_for_status()
-
-        content_length = int(resp.headers.get('Content-Length', 0))
 
         # prefer sha256 over md5 when both are available
         checksum_builder = checksum_type = checksum = None
@@ -60,27 +76,54 @@ def download(
             checksum_type = "md5"
             checksum = md5
 
+        # Only probe for range support when the expected size says the package is large, so
+        # that small downloads don't pay for an extra HEAD round trip. The ftp:// and s3://
+        # adapters don't implement HEAD, so they always take the single GET path.
+        resp = streamed_bytes = None
+        if (size is not None and size >= RANGED_DOWNLOAD_MIN_SIZE
+                and urlparse(url).scheme in ('http', 'https')):
+            content_length = probe_ranged_download(session, url, timeout)
+            if content_length:
+                streamed_bytes = session.ranged_get(
+                    url, target_full_path, content_length, timeout=timeout,
+                    progress_update_callback=progress_update_callback,
+                )
+                if streamed_bytes is None:
+                    log.debug("Range requests not honored for %s, using a single GET", url)
+
         size_builder = 0
         try:
-            with open(target_full_path, 'wb') as fh:
-                streamed_bytes = 0
-                for chunk in resp.iter_content(2 ** 14):
-                    # chunk could be the decompressed form of the real data
-                    # but we want the exact number of bytes read till now
-                    streamed_bytes = resp.raw.tell()
-                    try:
-                        fh.write(chunk)
-                    except IOError as e:
-                        message = "Failed to write to %(target_path)s\n  errno: %(errno)d"
-                        # TODO: make this CondaIOError
-                        raise CondaError(message, target_path=target_full_path, errno=e.errno)
-
-                    checksum_builder and checksum_builder.update(chunk)
-                    size_builder += len(chunk)
-
-                    if content_length and 0 <= streamed_bytes <= content_length:
-                        if progress_update_callback:
-                            progress_update_callback(streamed_bytes / content_length)
+            if streamed_bytes is None:
+                resp = session.get(url, stream=True, proxies=session.proxies, timeout=timeout)
+                if log.isEnabledFor(DEBUG):
+                    log.debug(stringify(resp, content_max_len=256))
+                resp.raise_for_status()
+
+                content_length = int(resp.headers.get('Content-Length', 0))
+                with open(target_full_path, 'wb') as fh:
+                    streamed_bytes = 0
+                    for chunk in resp.iter_content(2 ** 14):
+                        # chunk could be the decompressed form of the real data
+                        # but we want the exact number of bytes read till now
+                        streamed_bytes = resp.raw.tell()
+                        try:
+                            fh.write(chunk)
+                        except IOError as e:
+                            message = "Failed to write to %(target_path)s\n  errno: %(errno)d"
+                            # TODO: make this CondaIOError
+                            raise CondaError(message, target_path=target_full_path, errno=e.errno)
+
+                        checksum_builder and checksum_builder.update(chunk)
+                        size_builder += len(chunk)
+
+                        if content_length and 0 <= streamed_bytes <= content_length:
+                            if progress_update_callback:
+                                progress_update_callback(streamed_bytes / content_length)
+            else:
+                with open(target_full_path, 'rb') as fh:
+                    for chunk in iter(partial(fh.read, 2 ** 20), b''):
+                        checksum_builder and checksum_builder.update(chunk)
+                        size_builder += len(chunk)
 
             if content_length and streamed_bytes != content_length:
                 # TODO: needs to be a more-specific error type
@@ -100,6 +143,12 @@ def download(
                 # Connection reset by peer
                 log.debug("%s, trying again" % e)
             raise
+        finally:
+            # Hand the connection back to the pool (or drop it, if the body was abandoned
+            # part way through) now rather than when resp is garbage collected. Adapters
+            # that return file-backed responses release their files here too.
+            if resp is not None:
+                resp.close()
 
         if checksum:
             actual_checksum = checksum_builder.hexdigest()
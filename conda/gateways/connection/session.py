@@ -4,11 +4,12 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from logging import getLogger
-from threading import local
+from threading import Lock, local
 
-from . import (AuthBase, BaseAdapter, HTTPAdapter, Session, _basic_auth_str,
-               extract_cookies_to_jar, get_auth_from_url, get_netrc_auth)
+from . import (AuthBase, BaseAdapter, Session, _basic_auth_str, extract_cookies_to_jar,
+               get_auth_from_url, get_netrc_auth)
 from .adapters.ftp import FTPAdapter
+from .adapters.http import CondaHTTPAdapter
 from .adapters.localfs import LocalFSAdapter
 from .adapters.s3 import S3Adapter
 from ..anaconda_client import read_binstar_tokens
@@ -16,6 +17,7 @@ from ..._vendor.auxlib.ish import dals
 from ...base.constants import CONDA_HOMEPAGE_URL
 from ...base.context import context
 from ...common.compat import iteritems, with_metaclass
+from ...common.io import ThreadLimitedThreadPoolExecutor
 from ...common.url import (add_username_and_password, get_proxy_username_and_pass,
                            split_anaconda_token, urlparse)
 from ...exceptions import ProxyError
@@ -23,6 +25,31 @@ from ...exceptions import ProxyError
 log = getLogger(__name__)
 RETRIES = 3
 
+_http_adapters = {}
+_http_adapters_lock = Lock()
+
+
+def _get_http_adapter(max_retries, pool_maxsize):
+    """
+    Return the process-wide HTTPAdapter for the given configuration.
+
+    CondaSession instances are per-thread because requests.Session is not thread-safe, but
+    the urllib3 connection pool behind HTTPAdapter is. Sharing one adapter lets every thread's
+    session reuse the same keep-alive connections instead of each opening its own.
+    """
+    key = max_retries, pool_maxsize
+    with _http_adapters_lock:
+        try:
+            return _http_adapters[key]
+        except KeyError:
+            http_adapter = _http_adapters[key] = CondaHTTPAdapter(
+                max_retries=max_retries,
+                pool_connections=pool_maxsize,
+                pool_maxsize=pool_maxsize,
+                pool_block=False,
+            )
+            return http_adapter
+
 
 class EnforceUnusedAdapter(BaseAdapter):
 
@@ -74,7 +101,8 @@ class CondaSession(Session):
 
         else:
             # Configure retries
-            http_adapter = HTTPAdapter(max_retries=context.remote_max_retries)
+            http_adapter = _get_http_adapter(context.remote_max_retries,
+                                             context.http_pool_maxsize)
             self.mount("http://", http_adapter)
             self.mount("https://", http_adapter)
             self.mount("ftp://", FTPAdapter())
@@ -91,6 +119,65 @@ class CondaSession(Session):
         elif context.client_ssl_cert:
             self.cert = context.client_ssl_cert
 
+    def ranged_get(self, url, target_full_path, content_length, chunk_size=8 * 1024 * 1024,
+                   concurrency=8, timeout=None, progress_update_callback=None):
+        """
+        Download url into target_full_path as up to `concurrency` parallel byte-range GETs of
+        `chunk_size` bytes each. All ranges share the process-wide connection pool.
+
+        The first range is fetched on its own, so a server that advertises range support but
+        ignores the Range header costs one request rather than one per chunk.
+
+        Returns the number of bytes written, or None if the server answered any range request
+        with something other than a 206 Partial Content for exactly the requested range (error
+        statuses included), in which case target_full_path is incomplete and the caller should
+        fall back to a single GET.
+        """
+        with open(target_full_path, 'wb') as fh:
+            fh.truncate(content_length)
+
+        progress_lock = Lock()
+        progress = [0]
+
+        def fetch_range(start, end):
+            # CondaSession instances are per-thread; this is the worker thread's own session
+            session = CondaSession()
+            headers = {'Range': 'bytes=%d-%d' % (start, end)}
+            resp = session.get(url, headers=headers, stream=True, proxies=session.proxies,
+                               timeout=timeout)
+            try:
+                # error statuses fall through too; the caller's single GET reports real failures
+                content_range = resp.headers.get('Content-Range', '')
+                if (resp.status_code != 206
+                        or content_range.partition('/')[0] != 'bytes %d-%d' % (start, end)):
+                    return None
+                written = 0
+                with open(target_full_path, 'r+b') as fh:
+                    fh.seek(start)
+                    for chunk in resp.iter_content(2 ** 14):
+                        fh.write(chunk)
+                        written += len(chunk)
+                        if progress_update_callback:
+                            with progress_lock:
+                                progress[0] += len(chunk)
+                                progress_update_callback(progress[0] / content_length)
+                return written
+            finally:
+                resp.close()
+
+        ranges = [(start, min(start + chunk_size, content_length) - 1)
+                  for start in range(0, content_length, chunk_size)]
+        results = [fetch_range(*ranges[0])]
+        if results[0] is None:
+            return None
+        if len(ranges) > 1:
+            with ThreadLimitedThreadPoolExecutor(concurrency) as executor:
+                futures = [executor.submit(fetch_range, start, end) for start, end in ranges[1:]]
+                results.extend(future.result() for future in futures)
+        if any(written is None for written in results):
+            return None
+        return sum(results)
+
 
 class CondaHttpAuth(AuthBase):
     # TODO: make this class thread-safe by adding some of the requests.auth.HTTPDigestAuth() code
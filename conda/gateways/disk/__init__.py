@@ -7,6 +7,7 @@ from errno import EACCES, EEXIST, ENOENT, ENOTEMPTY, EPERM, errorcode
 from logging import getLogger
 import os
 from os.path import basename, isdir, dirname
+from shutil import copyfileobj as _copyfileobj
 from subprocess import CalledProcessError
 import sys
 from time import sleep
@@ -16,6 +17,7 @@ from ...common.compat import on_win
 log = getLogger(__name__)
 
 MAX_TRIES = 7
+SENDFILE_BLOCK_SIZE = 0x40000000  # 1 GB
 
 
 def exp_backoff_fn(fn, *args, **kwargs):
@@ -60,6 +62,44 @@ def exp_backoff_fn(fn, *args, **kwargs):
             return result
 
 
+def copyfileobj(fsrc, fdst, length=16 * 1024):
+    """
+    Like shutil.copyfileobj, except that on Linux, when both objects are backed by file
+    descriptors, the data is moved in-kernel by os.sendfile rather than through a userspace
+    buffer.
+    """
+    sendfile = getattr(os, 'sendfile', None)
+    if sendfile and sys.platform.startswith('linux'):
+        try:
+            in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+            # pipes and sockets have no position for sendfile to read from
+            start = offset = fsrc.tell()
+        except (AttributeError, EnvironmentError, ValueError):
+            pass
+        else:
+            fdst.flush()
+            try:
+                while True:
+                    sent = sendfile(out_fd, in_fd, offset, SENDFILE_BLOCK_SIZE)
+                    if not sent:
+                        break
+                    offset += sent
+            except EnvironmentError as e:
+                if offset != start:
+                    raise
+                log.trace("sendfile unavailable, falling back to buffered copy: %r", e)
+            else:
+                # sendfile reads at an explicit offset and writes through out_fd, so bring
+                # both file objects' notion of their position back in line
+                fsrc.seek(offset)
+                try:
+                    fdst.seek(os.lseek(out_fd, 0, os.SEEK_CUR))
+                except (EnvironmentError, ValueError):
+                    pass
+                return
+    _copyfileobj(fsrc, fdst, length)
+
+
 def mkdir_p(path):
     # putting this here to help with circular imports
     try:
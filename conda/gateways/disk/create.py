@@ -9,14 +9,14 @@ from io import open
 from logging import getLogger
 import os
 from os.path import basename, dirname, isdir, isfile, join, splitext
-from shutil import copyfileobj, copystat
+from shutil import copystat
 import sys
 import tempfile
 import warnings as _warnings
 
 import conda_package_handling.api
 
-from . import mkdir_p
+from . import copyfileobj, mkdir_p
 from .delete import path_is_clean, rm_rf
 from .link import islink, lexists, link, readlink, symlink
 from .permissions import make_executable
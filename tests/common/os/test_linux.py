@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from os.path import join
+
+from conda.common._os.linux import linux_get_os_release
+from conda.common.compat import ensure_binary
+from conda.gateways.disk.create import TemporaryDirectory
+
+
+def test_linux_get_os_release():
+    with TemporaryDirectory() as tmpdir:
+        path = join(tmpdir, 'os-release')
+        with open(path, 'wb') as fh:
+            fh.write(ensure_binary('# comment\n'
+                                   'NAME="Debian GNU/Linux"\n'
+                                   'ID=debian\n'
+                                   "VERSION_ID='9'\n"
+                                   '\n'))
+        os_release = linux_get_os_release(path)
+        assert os_release == {
+            'NAME': 'Debian GNU/Linux',
+            'ID': 'debian',
+            'VERSION_ID': '9',
+        }
+
+
+def test_linux_get_os_release_missing():
+    assert linux_get_os_release('/some/location/doesnt/exist') == {}
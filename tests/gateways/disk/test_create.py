@@ -1,5 +1,46 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, division, print_function, unicode_literals
 from logging import getLogger
+import os
+from os.path import join
+from threading import Thread
+
+from conda.gateways.disk import copyfileobj
+from conda.gateways.disk.create import TemporaryDirectory
 
 log = getLogger(__name__)
+
+
+def test_copyfileobj_from_offset():
+    data = os.urandom(100000)
+    with TemporaryDirectory() as tmpdir:
+        src, dst = join(tmpdir, 'src'), join(tmpdir, 'dst')
+        with open(src, 'wb') as fh:
+            fh.write(data)
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fsrc.read(10)
+            fdst.write(b'head')
+            copyfileobj(fsrc, fdst)
+            assert fsrc.tell() == len(data)
+            fdst.write(b'tail')
+        with open(dst, 'rb') as fh:
+            assert fh.read() == b'head' + data[10:] + b'tail'
+
+
+def test_copyfileobj_from_pipe():
+    data = os.urandom(100000)
+    read_fd, write_fd = os.pipe()
+
+    def writer():
+        with os.fdopen(write_fd, 'wb') as fh:
+            fh.write(data)
+
+    thread = Thread(target=writer)
+    thread.start()
+    with TemporaryDirectory() as tmpdir:
+        dst = join(tmpdir, 'dst')
+        with os.fdopen(read_fd, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            copyfileobj(fsrc, fdst)
+        thread.join()
+        with open(dst, 'rb') as fh:
+            assert fh.read() == data
@@ -1,17 +1,26 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import gc
 from logging import getLogger
+import os
+from os.path import isdir
+from socket import SOL_SOCKET, SO_KEEPALIVE
+from threading import Thread
 from conda._vendor.auxlib.compat import Utf8NamedTemporaryFile
 from unittest import TestCase
 import warnings
 
 import pytest
-from requests import HTTPError
+from requests import HTTPError, Request
 
+from conda.base.context import conda_tests_ctxt_mgmt_def_pol
 from conda.common.compat import ensure_binary, PY3
+from conda.common.io import env_var
 from conda.common.url import path_to_url
 from conda.gateways.anaconda_client import remove_binstar_token, set_binstar_token
+from conda.gateways.connection.adapters.ftp import parse_multipart_files
+from conda.gateways.connection.adapters.http import CondaHTTPAdapter
 from conda.gateways.connection.session import CondaHttpAuth, CondaSession
 from conda.gateways.disk.delete import rm_rf
 
@@ -66,3 +75,68 @@ class CondaSessionTests(TestCase):
         finally:
             if test_path is not None:
                 rm_rf(test_path)
+
+    @pytest.mark.skipif(not isdir('/proc/self/fd'), reason="needs /proc/self/fd")
+    def test_local_file_adapter_unclosed_responses_release_fds(self):
+        test_path = None
+        try:
+            with Utf8NamedTemporaryFile(delete=False) as fh:
+                test_path = fh.name
+                fh.write(ensure_binary('{"content": "file content"}'))
+
+            test_url = path_to_url(test_path)
+            session = CondaSession()
+            gc.collect()
+            fds_before = len(os.listdir('/proc/self/fd'))
+            for _ in range(50):
+                # the response is deliberately dropped without close()
+                assert session.get(test_url).json()['content'] == "file content"
+            gc.collect()
+            assert len(os.listdir('/proc/self/fd')) <= fds_before
+        finally:
+            if test_path is not None:
+                rm_rf(test_path)
+
+    def test_http_adapter_pool_size_and_socket_options(self):
+        sessions = []
+        with env_var('CONDA_HTTP_POOL_MAXSIZE', 7, stack_callback=conda_tests_ctxt_mgmt_def_pol):
+            # sessions are cached per thread, so build one under the new setting elsewhere
+            thread = Thread(target=lambda: sessions.append(CondaSession()))
+            thread.start()
+            thread.join()
+        http_adapter = sessions[0].get_adapter("https://")
+        assert isinstance(http_adapter, CondaHTTPAdapter)
+        pool_kw = http_adapter.poolmanager.connection_pool_kw
+        assert pool_kw['maxsize'] == 7
+        assert (SOL_SOCKET, SO_KEEPALIVE, 1) in pool_kw['socket_options']
+
+    def test_http_adapter_shared_across_threads(self):
+        sessions = []
+        thread = Thread(target=lambda: sessions.append(CondaSession()))
+        thread.start()
+        thread.join()
+        session = CondaSession()
+        assert sessions[0] is not session
+        assert sessions[0].get_adapter("https://") is session.get_adapter("https://")
+
+    def test_local_file_adapter_empty_file(self):
+        test_path = None
+        try:
+            with Utf8NamedTemporaryFile(delete=False) as fh:
+                test_path = fh.name
+
+            session = CondaSession()
+            r = session.get(path_to_url(test_path))
+            r.raise_for_status()
+            assert r.status_code == 200
+            assert r.content == b""
+        finally:
+            if test_path is not None:
+                rm_rf(test_path)
+
+
+def test_ftp_parse_multipart_files():
+    content = b"\x00\x01binary content\xff"
+    request = Request("POST", "ftp://ftp.example.test/upload/pkg.tar.bz2",
+                      files={"file": ("pkg.tar.bz2", content)}).prepare()
+    assert parse_multipart_files(request).read() == content
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from io import BytesIO
+from tempfile import mktemp
+
+from conda.base.context import conda_tests_ctxt_mgmt_def_pol
+from conda.common.io import env_var
+from conda.gateways.connection import CaseInsensitiveDict, Response
+from conda.gateways.connection.adapters import s3
+from conda.gateways.connection.adapters.s3 import (S3Adapter, StreamingBodyReader,
+                                                   _acquire_spill_file, _release_once,
+                                                   _release_spill_file)
+from conda.gateways.connection.download import download
+from conda.gateways.disk.delete import rm_rf
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+def test_release_spill_file_truncates_and_pools():
+    with patch.object(s3, '_spill_files', []):
+        fh = _acquire_spill_file()
+        try:
+            fh.write(b"package data")
+            _release_spill_file(fh)
+            assert s3._spill_files == [fh]
+            assert not fh.closed
+            assert fh.tell() == 0
+            assert fh.read() == b""
+            assert _acquire_spill_file() is fh
+        finally:
+            fh.close()
+
+
+def test_release_spill_file_capped_at_s3_max_concurrency():
+    with env_var('CONDA_S3_MAX_CONCURRENCY', 2, stack_callback=conda_tests_ctxt_mgmt_def_pol):
+        with patch.object(s3, '_spill_files', []):
+            files = [_acquire_spill_file() for _ in range(3)]
+            try:
+                for fh in files:
+                    _release_spill_file(fh)
+                assert s3._spill_files == files[:2]
+                assert files[2].closed
+            finally:
+                for fh in files:
+                    fh.close()
+
+
+def test_release_once_ignores_second_close():
+    with patch.object(s3, '_spill_files', []):
+        fh = _acquire_spill_file()
+        try:
+            close = _release_once(fh)
+            close()
+            # the next download picks the file back up and fills it
+            assert _acquire_spill_file() is fh
+            fh.write(b"next package")
+            close()
+            assert s3._spill_files == []
+            fh.seek(0)
+            assert fh.read() == b"next package"
+        finally:
+            fh.close()
+
+
+class FakeStreamingBody(object):
+    """Just enough of botocore's StreamingBody: read(amt) and close(), but no tell()."""
+
+    def __init__(self, content):
+        self._buffer = BytesIO(content)
+        self.closed = False
+
+    def read(self, amt=None):
+        return self._buffer.read(amt)
+
+    def close(self):
+        self.closed = True
+
+
+def test_streaming_body_reader():
+    body = FakeStreamingBody(b"0123456789")
+    reader = StreamingBodyReader(body)
+    assert reader.tell() == 0
+    assert reader.read(4) == b"0123"
+    assert reader.tell() == 4
+    assert reader.read() == b"456789"
+    assert reader.tell() == 10
+    assert reader.read(4) == b""
+    assert reader.tell() == 10
+    reader.close()
+    assert body.closed
+
+
+def test_download_progress_with_streaming_body_reader():
+    content = b"x" * (2 ** 16 + 100)
+
+    def send(self, request, **kwargs):
+        resp = Response()
+        resp.status_code = 200
+        resp.url = request.url
+        resp.headers = CaseInsensitiveDict({"Content-Length": str(len(content))})
+        resp.raw = StreamingBodyReader(FakeStreamingBody(content))
+        resp.close = resp.raw.close
+        return resp
+
+    progress = []
+    target_full_path = mktemp()
+    try:
+        with patch.object(S3Adapter, 'send', autospec=True, side_effect=send):
+            download("s3://bucket/pkgs/pkg-1.0-0.tar.bz2", target_full_path,
+                     size=len(content), progress_update_callback=progress.append)
+        with open(target_full_path, 'rb') as fh:
+            assert fh.read() == content
+        assert progress
+        assert progress == sorted(progress)
+        assert progress[-1] == 1.0
+    finally:
+        rm_rf(target_full_path)
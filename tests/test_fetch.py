@@ -1,3 +1,5 @@
+import hashlib
+from io import BytesIO
 import os
 from unittest import TestCase
 
@@ -9,11 +11,36 @@ from tempfile import mktemp
 from conda.base.constants import DEFAULT_CHANNEL_ALIAS
 from conda.base.context import conda_tests_ctxt_mgmt_def_pol
 from conda.common.io import env_var
-from conda.exceptions import CondaHTTPError
+from conda.exceptions import ChecksumMismatchError, CondaHTTPError
+from conda.gateways.connection import CaseInsensitiveDict, Response
+from conda.gateways.connection import download as gateway_download
+from conda.gateways.connection.adapters.ftp import FTPAdapter
+from conda.gateways.connection.adapters.s3 import S3Adapter
 from conda.gateways.connection.download import TmpDownload
+from conda.gateways.connection.session import CondaSession
+from conda.gateways.disk.delete import rm_rf
 from conda.core.subdir_data import fetch_repodata_remote_request
 from conda.core.package_cache_data import download
 
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+PKG_URL = "https://repo.anaconda.test/pkgs/main/linux-64/pkg-1.0-0.tar.bz2"
+PKG_CONTENT = b"0123456789abcdefghij"
+
+
+def range_callback(request):
+    start, end = request.headers['Range'][len('bytes='):].split('-')
+    start, end = int(start), int(end)
+    headers = {'Content-Range': 'bytes %d-%d/%d' % (start, end, len(PKG_CONTENT))}
+    return 206, headers, PKG_CONTENT[start:end + 1]
+
+
+def get_requests():
+    return [call.request for call in responses.calls if call.request.method == 'GET']
+
 
 @pytest.mark.integration
 class TestConnectionWithShortTimeouts(TestCase):
@@ -79,3 +106,196 @@ class TestDownload(TestCase):
                           content_type='application/json')
             download(url, mktemp())
             assert msg in str(execinfo)
+
+    @responses.activate
+    def test_download_closes_response_on_http_error(self):
+        responses.add(responses.GET, PKG_URL, body='{"error": "not found"}', status=404,
+                      content_type='application/json')
+        target_full_path = mktemp()
+        try:
+            with patch.object(Response, 'close', autospec=True,
+                              side_effect=Response.close) as mock_close:
+                with pytest.raises(CondaHTTPError):
+                    gateway_download.download(PKG_URL, target_full_path)
+                assert mock_close.call_count == 1
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_download_closes_response_on_checksum_mismatch(self):
+        responses.add(responses.GET, PKG_URL, body=PKG_CONTENT, status=200)
+        target_full_path = mktemp()
+        try:
+            with patch.object(Response, 'close', autospec=True,
+                              side_effect=Response.close) as mock_close:
+                with pytest.raises(ChecksumMismatchError):
+                    gateway_download.download(PKG_URL, target_full_path,
+                                              sha256=hashlib.sha256(b"other").hexdigest())
+                assert mock_close.call_count == 1
+        finally:
+            rm_rf(target_full_path)
+
+class TestRangedDownload(TestCase):
+
+    @responses.activate
+    def test_ranged_get(self):
+        responses.add_callback(responses.GET, PKG_URL, callback=range_callback)
+        target_full_path = mktemp()
+        try:
+            written = CondaSession().ranged_get(PKG_URL, target_full_path, len(PKG_CONTENT),
+                                                chunk_size=6, concurrency=3)
+            assert written == len(PKG_CONTENT)
+            with open(target_full_path, 'rb') as fh:
+                assert fh.read() == PKG_CONTENT
+            assert len(get_requests()) == 4
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_ranged_get_range_ignored(self):
+        responses.add(responses.GET, PKG_URL, body=PKG_CONTENT, status=200)
+        target_full_path = mktemp()
+        try:
+            assert CondaSession().ranged_get(PKG_URL, target_full_path, len(PKG_CONTENT),
+                                             chunk_size=6, concurrency=3) is None
+            # only the first range is tried before giving up
+            assert len(get_requests()) == 1
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_ranged_get_content_range_mismatch(self):
+        def first_range_callback(request):
+            # always answers with the first range, whatever was asked for
+            headers = {'Content-Range': 'bytes 0-5/%d' % len(PKG_CONTENT)}
+            return 206, headers, PKG_CONTENT[0:6]
+
+        responses.add_callback(responses.GET, PKG_URL, callback=first_range_callback)
+        target_full_path = mktemp()
+        try:
+            assert CondaSession().ranged_get(PKG_URL, target_full_path, len(PKG_CONTENT),
+                                             chunk_size=6, concurrency=3) is None
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_ranged_get_range_error(self):
+        responses.add(responses.GET, PKG_URL, status=416)
+        target_full_path = mktemp()
+        try:
+            assert CondaSession().ranged_get(PKG_URL, target_full_path, len(PKG_CONTENT),
+                                             chunk_size=6, concurrency=3) is None
+            assert len(get_requests()) == 1
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_download_uses_ranges(self):
+        responses.add(responses.HEAD, PKG_URL, status=200, headers={
+            'Accept-Ranges': 'bytes',
+            'Content-Length': str(len(PKG_CONTENT)),
+        })
+        responses.add_callback(responses.GET, PKG_URL, callback=range_callback)
+        target_full_path = mktemp()
+        try:
+            with patch.object(gateway_download, 'RANGED_DOWNLOAD_MIN_SIZE', 1):
+                # the checksum can only match if the assembled file is re-hashed from disk
+                gateway_download.download(PKG_URL, target_full_path,
+                                          sha256=hashlib.sha256(PKG_CONTENT).hexdigest(),
+                                          size=len(PKG_CONTENT))
+            with open(target_full_path, 'rb') as fh:
+                assert fh.read() == PKG_CONTENT
+            assert get_requests()
+            assert all('Range' in request.headers for request in get_requests())
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_download_falls_back_to_single_get(self):
+        responses.add(responses.HEAD, PKG_URL, status=200, headers={
+            'Accept-Ranges': 'bytes',
+            'Content-Length': str(len(PKG_CONTENT)),
+        })
+        responses.add(responses.GET, PKG_URL, body=PKG_CONTENT, status=200)
+        target_full_path = mktemp()
+        try:
+            with patch.object(gateway_download, 'RANGED_DOWNLOAD_MIN_SIZE', 1):
+                gateway_download.download(PKG_URL, target_full_path,
+                                          sha256=hashlib.sha256(PKG_CONTENT).hexdigest(),
+                                          size=len(PKG_CONTENT))
+            with open(target_full_path, 'rb') as fh:
+                assert fh.read() == PKG_CONTENT
+            # one range probe that came back 200, then the plain GET
+            assert len(get_requests()) == 2
+            assert 'Range' not in get_requests()[1].headers
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_download_falls_back_on_range_error(self):
+        def callback(request):
+            if 'Range' in request.headers:
+                return 403, {}, b''
+            return 200, {}, PKG_CONTENT
+
+        responses.add(responses.HEAD, PKG_URL, status=200, headers={
+            'Accept-Ranges': 'bytes',
+            'Content-Length': str(len(PKG_CONTENT)),
+        })
+        responses.add_callback(responses.GET, PKG_URL, callback=callback)
+        target_full_path = mktemp()
+        try:
+            with patch.object(gateway_download, 'RANGED_DOWNLOAD_MIN_SIZE', 1):
+                gateway_download.download(PKG_URL, target_full_path,
+                                          sha256=hashlib.sha256(PKG_CONTENT).hexdigest(),
+                                          size=len(PKG_CONTENT))
+            with open(target_full_path, 'rb') as fh:
+                assert fh.read() == PKG_CONTENT
+            assert len(get_requests()) == 2
+            assert 'Range' not in get_requests()[1].headers
+        finally:
+            rm_rf(target_full_path)
+
+    @responses.activate
+    def test_download_small_package_skips_probe(self):
+        responses.add(responses.GET, PKG_URL, body=PKG_CONTENT, status=200)
+        target_full_path = mktemp()
+        try:
+            gateway_download.download(PKG_URL, target_full_path, size=len(PKG_CONTENT))
+            assert [call.request.method for call in responses.calls] == ['GET']
+        finally:
+            rm_rf(target_full_path)
+
+    def _assert_large_download_without_head(self, adapter_class, url):
+        methods = []
+
+        def send(self, request, **kwargs):
+            methods.append(request.method)
+            resp = Response()
+            resp.status_code = 200
+            resp.url = request.url
+            resp.headers = CaseInsensitiveDict({
+                "Accept-Ranges": "bytes",
+                "Content-Length": str(len(PKG_CONTENT)),
+            })
+            resp.raw = BytesIO(PKG_CONTENT)
+            return resp
+
+        target_full_path = mktemp()
+        try:
+            with patch.object(gateway_download, 'RANGED_DOWNLOAD_MIN_SIZE', 1):
+                with patch.object(adapter_class, 'send', autospec=True, side_effect=send):
+                    gateway_download.download(url, target_full_path, size=len(PKG_CONTENT))
+            assert methods == ['GET']
+            with open(target_full_path, 'rb') as fh:
+                assert fh.read() == PKG_CONTENT
+        finally:
+            rm_rf(target_full_path)
+
+    def test_download_s3_never_probes(self):
+        self._assert_large_download_without_head(
+            S3Adapter, "s3://bucket/pkgs/main/linux-64/pkg-1.0-0.tar.bz2")
+
+    def test_download_ftp_never_probes(self):
+        self._assert_large_download_without_head(
+            FTPAdapter, "ftp://ftp.anaconda.test/pkgs/main/linux-64/pkg-1.0-0.tar.bz2")